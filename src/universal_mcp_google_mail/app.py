@@ -1,20 +1,621 @@
+import asyncio
 import base64
+import copy
+import functools
+import gzip
+import importlib.util
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from email import policy
+from email.generator import BytesGenerator
+from email.header import Header
 from email.message import EmailMessage
-from typing import Any
+from email.parser import BytesParser
+from typing import Any, AsyncIterator, Iterator, NamedTuple
+from urllib.parse import quote
 from loguru import logger
 import concurrent.futures
 
+import httpx
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # orjson is an optional speedup; the stdlib parser also accepts bytes
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
 from universal_mcp.applications import APIApplication
 from universal_mcp.integrations import Integration
 
+# Gmail accepts up to 100 sub-requests per batch call, but rate limits batches of more than 50
+_BATCH_LIMIT = 50
+# load_thread calls arriving within this many seconds are fetched in one batch request
+_THREAD_LOAD_WINDOW = 0.01
+_BATCH_URL = "https://gmail.googleapis.com/batch/gmail/v1"
+# messages.batchModify rejects requests naming more than this many message IDs
+_BATCH_MODIFY_LIMIT = 1000
+# Batch requests get_messages_batch keeps in flight at once, in both apps
+_BATCH_CONCURRENCY = 4
+# Methods a batch sub-request may use; its path is written verbatim into the request line
+_BATCH_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE"})
+_UNSAFE_PATH = re.compile(r"[\s\x00-\x1f\x7f]")
+_HTTP_HEADER_END = re.compile(rb"\r?\n\r?\n")
+# Keep enough idle connections for the parallel batch fan-out to reuse warm TLS sessions
+_HTTP_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=16)
+_ASYNC_HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+# Multiplex concurrent calls over one connection when the optional h2 package is installed
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_BROTLI = importlib.util.find_spec("brotli") is not None or importlib.util.find_spec("brotlicffi") is not None
+# Connection attempts retried by the transport before a connect error is raised
+_CONNECT_RETRIES = 3
+# Rate-limit and transient server errors are retried for idempotent requests (reads,
+# deletes and batch lookups), backing off exponentially unless Gmail sends Retry-After
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_RETRY_ATTEMPTS = 5
+_RETRY_BACKOFF = 0.5
+# Longest wait taken for a single retry, whatever Retry-After asks for
+_RETRY_MAX_DELAY = 32.0
+# Methods whose requests (and batch sub-requests) are safe to resend after a 429 or 5xx
+_IDEMPOTENT_METHODS = frozenset({"GET", "PUT", "DELETE"})
+# Headers surfaced by the message tools; metadata lookups ask Gmail for only these
+_MESSAGE_HEADERS = ("From", "To", "Date", "Subject")
+_MESSAGE_HEADER_SET = frozenset(_MESSAGE_HEADERS)
+_METADATA_HEADERS_QUERY = "".join(f"&metadataHeaders={name}" for name in _MESSAGE_HEADERS)
+# Partial-response masks for batch message lookups; "formatted" keeps exactly what
+# _format_message reads, the others trim the resource further for callers that need less
+_FIELD_PROFILES = {
+    "ids": "id,threadId,labelIds",
+    "summary": "id,threadId,labelIds,snippet",
+    "headers": "id,threadId,labelIds,snippet,payload/headers",
+    "formatted": "id,threadId,snippet,payload(mimeType,headers,body/data,parts)",
+}
+# Labels rarely change, so list_labels results are reused for this many seconds
+_LABELS_TTL = 60
+# The profile (email address, counters, history ID) is reused for this many seconds
+_PROFILE_TTL = 300
+# Mailbox settings fetched together by get_all_settings, as /settings/<name> paths
+_SETTINGS_ENDPOINTS = ("imap", "pop", "vacation", "language", "autoForwarding")
+# Shared by EmailMessage and BytesGenerator so serialization never re-derives a policy
+_MIME_POLICY = policy.SMTP
+# RFC 5322 line length limit, excluding the CRLF; longer ASCII lines are sent base64-encoded
+_MAX_LINE_LENGTH = 998
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+# Read-only GETs (drafts, filters, threads) are answered from memory for this many seconds;
+# attachments are not cached, since a single one can be tens of megabytes
+_READ_CACHE_TTL = 30
+_READ_CACHE_SIZE = 512
+# The app's credentials address a single mailbox, so "me" and the account's own address
+# name the same data; cache keys use "me" for both
+_USER_SEGMENT = re.compile(r"(/users/)[^/]+/")
+# A message's headers and body never change once it exists, so formatted messages are
+# kept (bounded, oldest evicted first) for longer; writes through this app that touch a
+# message drop it right away, the TTL covers deletions made elsewhere
+_MESSAGE_CACHE_TTL = 300
+_MESSAGE_CACHE_SIZE = 4096
+# Standard Google API query parameters accepted by every generated endpoint method,
+# in the order of their keyword arguments
+_COMMON_QS_KEYS = (
+    "access_token",
+    "alt",
+    "callback",
+    "fields",
+    "key",
+    "oauth_token",
+    "prettyPrint",
+    "quotaUser",
+    "upload_protocol",
+    "uploadType",
+    "$.xgafv",
+)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# Request bodies smaller than this are never worth gzipping
+_GZIP_MIN_SIZE = 1024
+# MIME messages larger than this are sent through the media upload endpoints
+# instead of being base64-embedded in a JSON body
+_UPLOAD_THRESHOLD = 5 * 1024 * 1024
+# Google APIs only compress responses when the User-Agent also contains "gzip"
+# Transport methods yielded by _io_steps methods, and the coroutines AsyncGoogleMailApp runs
+# instead; every other yielded name is an _io_steps method or tool with the same async name
+_ASYNC_TRANSPORT = {
+    "_get": "_aget",
+    "_post": "_apost",
+    "_put": "_aput",
+    "_delete": "_adelete",
+    "_upload_message": "_aupload_message",
+    "_send_batch": "_asend_batch",
+    "_sleep": "_asleep",
+}
+_GZIP_HEADERS = {
+    # httpx only decodes brotli when the optional brotli package is installed
+    "Accept-Encoding": "gzip, br" if _BROTLI else "gzip",
+    "User-Agent": "universal-mcp-google-mail (gzip)",
+}
+
+
+def _build_batch_request(requests: list[str | tuple[str, str, Any]]) -> tuple[dict[str, str], bytes]:
+    """
+    Builds the multipart/mixed body of a Gmail batch request.
+
+    Args:
+        requests: The sub-requests, at most 100; each is either a GET request path (with
+            query string) or a (method, path, body) tuple whose body, when not None, is sent as JSON
+
+    Returns:
+        A tuple of the request headers and the encoded body; sub-request i is sent with
+        Content-ID "item-i"
+    """
+    boundary = f"batch_{uuid.uuid4().hex}"
+    parts = []
+    for i, request in enumerate(requests):
+        method, path, body = ("GET", request, None) if isinstance(request, str) else request
+        part = (
+            f"--{boundary}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <item-{i}>\r\n\r\n"
+            f"{method} {path} HTTP/1.1\r\n"
+        )
+        if body is None:
+            parts.append(f"{part}\r\n".encode())
+        else:
+            parts.append(f"{part}Content-Type: application/json\r\n\r\n".encode())
+            parts.append(_json_dumps(body))
+            parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    headers = {"Content-Type": f"multipart/mixed; boundary={boundary}"}
+    return headers, b"".join(parts)
+
+
+class MinimalMessage(NamedTuple):
+    """
+    Compact, immutable view of a message fetched with format=minimal.
+    """
+
+    id: str
+    threadId: str
+    labelIds: tuple[str, ...]
+    snippet: str
+    historyId: str | None
+    sizeEstimate: int | None
+
+    @classmethod
+    def from_resource(cls, resource: dict[str, Any]) -> "MinimalMessage":
+        return cls(
+            resource["id"],
+            resource.get("threadId", ""),
+            tuple(resource.get("labelIds", ())),
+            resource.get("snippet", ""),
+            resource.get("historyId"),
+            resource.get("sizeEstimate"),
+        )
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """
+    Returns how long to wait before retrying a failed request, honoring Retry-After (up to _RETRY_MAX_DELAY) when given in seconds.
+    """
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), _RETRY_MAX_DELAY)
+    return _RETRY_BACKOFF * 2**attempt + random.uniform(0, _RETRY_BACKOFF)
+
+
+def _build_upload_request(metadata: dict[str, Any], mime: bytes | memoryview) -> tuple[dict[str, str], bytes]:
+    """
+    Builds the multipart/related body of a Gmail media upload carrying an RFC 822 message.
+
+    Args:
+        metadata: The JSON resource sent alongside the message (e.g. its threadId)
+        mime: The serialized MIME message, sent as-is rather than base64 encoded
+
+    Returns:
+        A tuple of the request headers and the encoded body
+    """
+    boundary = f"upload_{uuid.uuid4().hex}"
+    body = b"".join(
+        (
+            f"--{boundary}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n".encode(),
+            _json_dumps(metadata),
+            f"\r\n--{boundary}\r\nContent-Type: message/rfc822\r\n\r\n".encode(),
+            mime,
+            f"\r\n--{boundary}--\r\n".encode(),
+        )
+    )
+    headers = {"Content-Type": f"multipart/related; boundary={boundary}"}
+    return headers, body
+
+
+def _plain_text_mime(to: str, subject: str, body: str) -> bytes | None:
+    """
+    Builds a plain-text RFC 5322 message directly, skipping EmailMessage's content heuristics.
+
+    Args:
+        to: The recipient header value
+        subject: The subject line
+        body: The plain-text body; ASCII bodies are sent as 7bit with CRLF line endings,
+            anything else base64-encoded
+
+    Returns:
+        The serialized message, or None when the headers need EmailMessage's handling
+        (non-ASCII recipients or embedded line breaks)
+    """
+    if not to.isascii() or any(c in to or c in subject for c in "\r\n"):
+        return None
+    encoded_subject = Header(subject, None if subject.isascii() else "utf-8").encode(linesep="\r\n")
+    lines = _LINE_BREAK.split(body)
+    if body.isascii() and all(len(line) <= _MAX_LINE_LENGTH for line in lines):
+        encoding, payload = "7bit", "\r\n".join(lines).encode("ascii")
+    else:
+        encoding, payload = "base64", base64.encodebytes(body.encode("utf-8")).replace(b"\n", b"\r\n")
+    head = (
+        f"To: {to}\r\n"
+        "From: me\r\n"
+        f"Subject: {encoded_subject}\r\n"
+        "MIME-Version: 1.0\r\n"
+        'Content-Type: text/plain; charset="utf-8"\r\n'
+        f"Content-Transfer-Encoding: {encoding}\r\n\r\n"
+    )
+    return head.encode("ascii") + payload
+
+
+def _common_qs(*values: Any) -> dict[str, Any]:
+    """
+    Returns the standard Google API query parameters that were set, given their values in _COMMON_QS_KEYS order.
+    """
+    # Callers almost never set these, so skip the comprehension when none are given;
+    # a fresh dict is returned because endpoints add their own parameters to it
+    if values.count(None) == len(values):
+        return {}
+    return {k: v for k, v in zip(_COMMON_QS_KEYS, values) if v is not None}
+
+
+def _read_cache_key(url: str, params: dict[str, Any] | None) -> tuple[str, tuple[tuple[str, str], ...]]:
+    """
+    Returns a hashable key for a GET request, independent of the parameter order and of the userId spelling.
+    """
+    url = _USER_SEGMENT.sub(r"\1me/", url, count=1)
+    return url, tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+
+
+def _path_segment(value: str) -> str:
+    """
+    Percent-encodes a caller-supplied value so it stays one segment of a batch sub-request line.
+    """
+    return quote(value, safe="")
+
+
+def _message_path(message_id: str, format: str, fields: str | None = None) -> str:
+    """
+    Returns the batch sub-request path for a single message lookup.
+    """
+    path = f"/gmail/v1/users/me/messages/{_path_segment(message_id)}?format={_path_segment(format)}"
+    if format == "metadata":
+        path += _METADATA_HEADERS_QUERY
+    if fields:
+        path += "&fields=" + fields
+    return path
+
+
+def _call(name: str, *args: Any, **kwargs: Any) -> tuple[str, tuple, dict[str, Any]]:
+    """
+    Describes one I/O call yielded by an _io_steps method: the name of the app method to run and its arguments.
+    """
+    return name, args, kwargs
+
+
+def _io_steps(steps):
+    """
+    Turns a generator method that yields its I/O as _call(...) descriptions into a plain method that
+    performs those calls synchronously. AsyncGoogleMailApp derives a coroutine from the same generator,
+    so request building and response handling are written once for both apps.
+    """
+
+    @functools.wraps(steps)
+    def method(self, *args, **kwargs):
+        return self._run_steps(steps(self, *args, **kwargs))
+
+    method._steps = steps
+    return method
+
+
+def _with_async_steps(cls):
+    """
+    Class decorator giving cls a coroutine for every inherited _io_steps method it does not define itself.
+    """
+
+    def coroutine(steps):
+        @functools.wraps(steps)
+        async def method(self, *args, **kwargs):
+            return await self._arun_steps(steps(self, *args, **kwargs))
+
+        return method
+
+    for name in dir(cls):
+        steps = getattr(getattr(cls, name, None), "_steps", None)
+        if steps is not None and name not in vars(cls):
+            setattr(cls, name, coroutine(steps))
+    return cls
+
+
+def _async_variant(sync_method):
+    """
+    Gives an async override the tool docstring of the GoogleMailApp method it mirrors.
+    """
+
+    def decorator(func):
+        func.__doc__ = sync_method.__doc__
+        return func
+
+    return decorator
+
+
+def _parse_batch_response(content_type: str, content: bytes) -> dict[str, tuple[int, Any]]:
+    """
+    Splits a multipart/mixed batch response into its embedded HTTP responses.
+
+    Args:
+        content_type: The Content-Type header of the batch response, including the boundary
+        content: The raw body of the batch response
+
+    Returns:
+        A dictionary mapping each part's Content-ID (without the "response-" prefix) to a
+        tuple of the embedded HTTP status code and its decoded JSON body (None when empty)
+    """
+    message = BytesParser().parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + content
+    )
+    results = {}
+    for part in message.walk():
+        if part.is_multipart():
+            continue
+        content_id = part.get("Content-ID", "").strip("<>").removeprefix("response-")
+        http_response = part.get_payload(decode=True) or b""
+        head, *rest = _HTTP_HEADER_END.split(http_response, maxsplit=1)
+        body = rest[0] if rest else b""
+        # Status line looks like "HTTP/1.1 200 OK"
+        status = int(head.split(None, 2)[1])
+        results[content_id] = (status, _json_loads(body) if body.strip() else None)
+    return results
+
+
+def _collect_batch_messages(
+    message_ids: list[str], results: list[tuple[int | None, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Picks the successfully retrieved messages out of the (status, body) results of a batch, in request order.
+    """
+    messages = []
+    for message_id, (status, data) in zip(message_ids, results):
+        if status != 200:
+            logger.error("Error retrieving message {}: status {}", message_id, status)
+            continue
+        messages.append(data)
+    return messages
 
 
 class GoogleMailApp(APIApplication):
+    # Opt-in: gzip request bodies over _GZIP_MIN_SIZE, trading a little CPU for fewer bytes on slow links
+    compress_requests = False
+
     def __init__(self, integration: Integration) -> None:
         super().__init__(name="google-mail", integration=integration)
         self.base_api_url = "https://gmail.googleapis.com/gmail/v1/users/me"
         self.base_url = "https://gmail.googleapis.com"
+        self._users_prefix = self.base_url + "/gmail/v1/users"
+        self._url_messages = self.base_api_url + "/messages"
+        self._url_send = self.base_api_url + "/messages/send"
+        self._url_drafts = self.base_api_url + "/drafts"
+        self._url_send_draft = self.base_api_url + "/drafts/send"
+        self._url_threads = self.base_api_url + "/threads"
+        self._url_labels = self.base_api_url + "/labels"
+        self._url_profile = self.base_api_url + "/profile"
+        self._url_upload_send = self.base_url + "/upload/gmail/v1/users/me/messages/send"
+        self._url_upload_drafts = self.base_url + "/upload/gmail/v1/users/me/drafts"
+        self._labels_cache: tuple[float, dict[str, Any]] | None = None
+        self._profile_cache: tuple[float, dict[str, Any]] | None = None
+        self._read_cache: dict[tuple, tuple[float, Any]] = {}
+        # Tools may run on several worker threads at once
+        self._read_cache_lock = threading.Lock()
+        self._message_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        self._message_cache_lock = threading.Lock()
+        # Mailbox history ID from the latest profile or history lookup, used as the
+        # starting point for incremental listings
+        self._last_history_id: str | None = None
+
+    @property
+    def client(self) -> httpx.Client:
+        """
+        Returns the shared HTTP client, creating it on first use so every Gmail call reuses pooled keep-alive connections.
+        """
+        if self._client is None:
+            self._client = httpx.Client(
+                base_url=self.base_url,
+                headers={**_GZIP_HEADERS, **self._get_headers()},
+                timeout=self.default_timeout,
+                transport=httpx.HTTPTransport(retries=_CONNECT_RETRIES, limits=_HTTP_LIMITS, http2=_HTTP2),
+            )
+        return self._client
+
+    def close(self) -> None:
+        """
+        Closes the pooled HTTP connections; the client is recreated if the app is used again.
+        """
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def __enter__(self) -> "GoogleMailApp":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _handle_response(self, response: httpx.Response) -> dict[str, Any]:
+        """
+        Raises for HTTP errors and decodes the JSON body directly from the response bytes.
+        """
+        if response.status_code >= 400:
+            response.raise_for_status()
+        if response.status_code == 204 or not response.content.strip():
+            return {"status": "success"}
+        return _json_loads(response.content)
+
+    def _finish(self, response: httpx.Response) -> Any:
+        """
+        Decodes a generated endpoint's response, raising for HTTP errors and returning None for empty (No Content) bodies.
+        """
+        if response.status_code >= 400:
+            response.raise_for_status()
+        return _json_loads(response.content) if response.content else None
+
+    def _get(self, url, params=None):
+        """
+        Sends a GET request, retrying rate-limited and transient server errors.
+        """
+        return self._request_with_retry("GET", url, params=params)
+
+    @_io_steps
+    def _get_json(self, url: str, params: dict[str, Any] | None = None) -> Any:
+        """
+        Sends a GET request and returns its decoded JSON body, raising for HTTP errors.
+        """
+        return self._handle_response((yield _call("_get", url, params)))
+
+    def _delete(self, url, params=None):
+        """
+        Sends a DELETE request, retrying rate-limited and transient server errors.
+        """
+        return self._request_with_retry("DELETE", url, params=params)
+
+    def _request_with_retry(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Sends an idempotent request on the shared client, retrying it with exponential backoff while Gmail answers 429 or 5xx.
+        """
+        for attempt in range(_RETRY_ATTEMPTS - 1):
+            response = self.client.request(method, url, **kwargs)
+            if response.status_code not in _RETRY_STATUSES:
+                return response
+            delay = _retry_delay(response, attempt)
+            logger.warning("Gmail returned {} for {} {}, retrying in {:.1f}s", response.status_code, method, url, delay)
+            time.sleep(delay)
+        return self.client.request(method, url, **kwargs)
+
+    def _sleep(self, seconds: float) -> None:
+        """
+        Waits before a retry; AsyncGoogleMailApp awaits asyncio.sleep instead.
+        """
+        time.sleep(seconds)
+
+    def _send_batch(self, content: bytes, headers: dict[str, str], idempotent: bool) -> httpx.Response:
+        """
+        Posts a Gmail batch request body, retrying it like other idempotent requests when every sub-request is idempotent.
+        """
+        if idempotent:
+            return self._request_with_retry("POST", _BATCH_URL, content=content, headers=headers)
+        return self.client.post(_BATCH_URL, content=content, headers=headers)
+
+    def _run_steps(self, steps: Iterator) -> Any:
+        """
+        Runs an _io_steps generator on the sync client, performing each call it yields and sending back
+        the result, or throwing the error back in so the generator can handle it.
+        """
+        result = error = None
+        while True:
+            try:
+                name, args, kwargs = steps.send(result) if error is None else steps.throw(error)
+            except StopIteration as done:
+                return done.value
+            result = error = None
+            try:
+                result = getattr(self, name)(*args, **kwargs)
+            except Exception as e:
+                error = e
+
+    def _post(self, url, data, params=None, content_type="application/json", files=None):
+        """
+        Sends JSON bodies encoded straight to bytes; other content types go through the base implementation.
+        """
+        if files or content_type != "application/json":
+            return super()._post(url, data, params=params, content_type=content_type, files=files)
+        return self._send_json("POST", url, data, params)
+
+    def _put(self, url, data, params=None, **kwargs):
+        """
+        Sends JSON bodies encoded straight to bytes, like _post.
+        """
+        if kwargs:
+            return super()._put(url, data, params=params, **kwargs)
+        return self._send_json("PUT", url, data, params)
 
+    def _send_json(self, method: str, url: str, data: Any, params: dict[str, Any] | None) -> httpx.Response:
+        """
+        Encodes the body once, straight to bytes, and sends it on the shared client.
+        """
+        content, headers = self._encode_body(_json_dumps(data), _JSON_HEADERS)
+        return self.client.request(method, url, content=content, params=params, headers=headers)
+
+    def _encode_body(self, content: bytes, headers: dict[str, str]) -> tuple[bytes, dict[str, str]]:
+        """
+        Gzips a request body when compress_requests is enabled and the body is large enough to benefit.
+        """
+        if not self.compress_requests or len(content) <= _GZIP_MIN_SIZE:
+            return content, headers
+        return gzip.compress(content, compresslevel=1), {**headers, "Content-Encoding": "gzip"}
+
+    def _cached_read(self, key: tuple) -> Any | None:
+        """
+        Returns a copy of the cached response for a read request key, or None when it is missing or expired.
+        """
+        with self._read_cache_lock:
+            cached = self._read_cache.get(key)
+            if cached is None:
+                return None
+            if time.monotonic() - cached[0] >= _READ_CACHE_TTL:
+                self._read_cache.pop(key, None)
+                return None
+        return copy.deepcopy(cached[1])
+
+    def _store_read(self, key: tuple, value: Any) -> None:
+        """
+        Caches a copy of a read response, evicting the oldest entry once the cache is full.
+        """
+        value = copy.deepcopy(value)
+        with self._read_cache_lock:
+            if len(self._read_cache) >= _READ_CACHE_SIZE:
+                self._read_cache.pop(next(iter(self._read_cache)), None)
+            self._read_cache[key] = (time.monotonic(), value)
+
+    @_io_steps
+    def _cached_get(self, url: str, params: dict[str, Any] | None = None) -> Any:
+        """
+        Performs a GET request and decodes its JSON body, reusing a recent identical response when available.
+        """
+        key = _read_cache_key(url, params)
+        value = self._cached_read(key)
+        if value is None:
+            value = yield _call("_get_json", url, params)
+            self._store_read(key, value)
+        return value
+
+    def invalidate_user(self, userId: str = "me") -> None:
+        """
+        Drops the cached read responses of a user's mailbox, so the next reads hit the API. "me" and the account's own address share cache entries.
+        """
+        marker = _read_cache_key(f"{self._users_prefix}/{userId}/", None)[0]
+        with self._read_cache_lock:
+            for key in [key for key in self._read_cache if marker in key[0]]:
+                self._read_cache.pop(key, None)
+
+    @_io_steps
     def send_email(self, to: str, subject: str, body: str, body_type: str = "plain", thread_id: str | None = None) -> dict[str, Any]:
         """
         Sends an email using the Gmail API and returns a confirmation or error message.
@@ -39,33 +640,51 @@ class GoogleMailApp(APIApplication):
         """
 
         
-        url = f"{self.base_api_url}/messages/send"
-        raw_message = self._create_message(to, subject, body, body_type)
-        email_data = {"raw": raw_message}
+        url = self._url_send
+        mime = self._create_mime(to, subject, body, body_type)
+        if len(mime) > _UPLOAD_THRESHOLD:
+            metadata = {"threadId": thread_id} if thread_id else {}
+            response = yield _call("_upload_message", self._url_upload_send, metadata, mime)
+            self.invalidate_user()
+            return self._handle_response(response)
+        email_data = {"raw": base64.urlsafe_b64encode(mime).decode("ascii")}
         
         # Add threadId to make it a proper reply if thread_id is provided
         if thread_id:
             email_data["threadId"] = thread_id
             
-        response = self._post(url, email_data)
+        response = yield _call("_post", url, email_data)
+        self.invalidate_user()
 
         return self._handle_response(response)
 
 
 
-    def _create_message(self, to, subject, body, body_type="plain"):
-        try:
-            message = EmailMessage()
-            message["to"] = to
-            message["subject"] = subject
-            message["from"] = "me"
-            message.set_content(body, subtype=body_type)
-            raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
-            return raw
-        except Exception as e:
-            logger.error(f"Error creating message: {str(e)}")
-            raise
+    def _create_mime(self, to, subject, body, body_type="plain"):
+        if body_type == "plain":
+            mime = _plain_text_mime(to, subject, body)
+            if mime is not None:
+                return mime
+        message = EmailMessage(policy=_MIME_POLICY)
+        message["to"] = to
+        message["subject"] = subject
+        message["from"] = "me"
+        message.set_content(body, subtype=body_type)
+        # Serialize straight into one buffer and encode from its view,
+        # avoiding the extra bytes copy made by message.as_bytes()
+        buffer = io.BytesIO()
+        BytesGenerator(buffer, policy=_MIME_POLICY).flatten(message)
+        return buffer.getbuffer()
+
+    def _upload_message(self, url: str, metadata: dict[str, Any], mime: bytes | memoryview) -> httpx.Response:
+        """
+        Sends a large MIME message through a Gmail media upload endpoint, skipping the base64 and JSON encoding.
+        """
+        headers, content = _build_upload_request(metadata, mime)
+        content, headers = self._encode_body(content, headers)
+        return self.client.post(url, content=content, headers=headers, params={"uploadType": "multipart"})
 
+    @_io_steps
     def create_draft(self, to: str, subject: str, body: str, body_type: str = "plain", thread_id: str | None = None) -> dict[str, Any]:
         """
         Creates a draft email message in Gmail using the Gmail API and returns a confirmation status.
@@ -89,22 +708,30 @@ class GoogleMailApp(APIApplication):
             create, email, draft, gmail, api, important, thread, reply, html
         """
         
-        url = f"{self.base_api_url}/drafts"
+        url = self._url_drafts
 
-        raw_message = self._create_message(to, subject, body, body_type)
+        mime = self._create_mime(to, subject, body, body_type)
+        if len(mime) > _UPLOAD_THRESHOLD:
+            metadata = {"message": {"threadId": thread_id}} if thread_id else {}
+            logger.info("Uploading draft email to {}", to)
+            response = yield _call("_upload_message", self._url_upload_drafts, metadata, mime)
+            self.invalidate_user()
+            return self._handle_response(response)
 
-        draft_data = {"message": {"raw": raw_message}}
+        draft_data = {"message": {"raw": base64.urlsafe_b64encode(mime).decode("ascii")}}
         
         # Add threadId to make it a proper reply if thread_id is provided
         if thread_id:
             draft_data["message"]["threadId"] = thread_id
 
-        logger.info(f"Creating draft email to {to}")
+        logger.info("Creating draft email to {}", to)
 
-        response = self._post(url, draft_data)
+        response = yield _call("_post", url, draft_data)
+        self.invalidate_user()
 
         return self._handle_response(response)
 
+    @_io_steps
     def send_draft(self, draft_id: str) -> dict[str, Any]:
         """
         Sends an existing draft email using the Gmail API and returns a confirmation message.
@@ -124,23 +751,25 @@ class GoogleMailApp(APIApplication):
             send, email, api, communication, important, draft
         """
         
-        url = f"{self.base_api_url}/drafts/send"
+        url = self._url_send_draft
 
         draft_data = {"id": draft_id}
 
-        logger.info(f"Sending draft email with ID: {draft_id}")
+        logger.info("Sending draft email with ID: {}", draft_id)
 
-        response = self._post(url, draft_data)
+        response = yield _call("_post", url, draft_data)
+        self.invalidate_user()
 
         return self._handle_response(response)
 
-    def get_draft(self, draft_id: str, format: str = "full") -> dict[str, Any]:
+    @_io_steps
+    def get_draft(self, draft_id: str, format: str = "metadata") -> dict[str, Any]:
         """
-        Retrieves and formats a specific draft email from Gmail by its ID
+        Retrieves and formats a specific draft email from Gmail by its ID. Only the headers and snippet are returned unless format='full' is passed, and the draft is reused for up to 30 seconds unless it is changed through this app.
 
         Args:
             draft_id: String identifier of the draft email to retrieve
-            format: Output format of the draft (options: minimal, full, raw, metadata). Defaults to 'full'
+            format: Output format of the draft (options: minimal, full, raw, metadata). Defaults to 'metadata', which returns the snippet and the From, To, Date and Subject headers; use 'full' to include the body
 
         Returns:
             A formatted string containing the draft email details (ID, recipient, subject) or an error message if retrieval fails
@@ -154,19 +783,20 @@ class GoogleMailApp(APIApplication):
             retrieve, email, gmail, draft, api, format, important
         """
         
-        url = f"{self.base_api_url}/drafts/{draft_id}"
+        url = self._url_drafts + "/" + draft_id
 
             # Add format parameter as query param
-        params = {"format": format}
+        params: dict[str, Any] = {"format": format}
+        if format == "metadata":
+            params["metadataHeaders"] = list(_MESSAGE_HEADERS)
 
-        logger.info(f"Retrieving draft with ID: {draft_id}")
+        logger.info("Retrieving draft with ID: {}", draft_id)
 
-        response = self._get(url, params=params)
-
-        return self._handle_response(response)
+        return (yield _call("_cached_get", url, params))
 
        
 
+    @_io_steps
     def list_drafts(
         self, max_results: int = 20, q: str | None = None, include_spam_trash: bool = False
     ) -> dict[str, Any]:
@@ -190,7 +820,7 @@ class GoogleMailApp(APIApplication):
             list, email, drafts, gmail, api, search, query, pagination, important
         """
         
-        url = f"{self.base_api_url}/drafts"
+        url = self._url_drafts
 
             # Build query parameters
         params: dict[str, Any] = {"maxResults": max_results}
@@ -201,13 +831,12 @@ class GoogleMailApp(APIApplication):
         if include_spam_trash:
                 params["includeSpamTrash"] = "true"
 
-        logger.info(f"Retrieving drafts list with params: {params}")
+        logger.info("Retrieving drafts list with params: {}", params)
 
-        response = self._get(url, params=params)
-
-        return self._handle_response(response)
+        return (yield _call("_get_json", url, params))
 
 
+    @_io_steps
     def get_message(self, message_id: str) -> dict[str, Any]:
         """
         Retrieves and formats a specific email message from Gmail API by its ID, including sender, recipient, date, subject, and full message body content.
@@ -221,16 +850,246 @@ class GoogleMailApp(APIApplication):
         Tags:
             retrieve, email, format, api, gmail, message, important, body, content
         """
-        url = f"{self.base_api_url}/messages/{message_id}"
-        response = self._get(url)
-        raw_data = self._handle_response(response)
+        cached = self._cached_message(message_id)
+        if cached is not None:
+            return cached
+        url = self._url_messages + "/" + message_id
+        raw_data = yield _call("_get_json", url)
+        return self._store_message(message_id, self._format_message(raw_data, message_id))
+
+    def _cached_message(self, message_id: str) -> dict[str, Any] | None:
+        """
+        Returns a copy of a cached formatted message, or None when it is missing or expired.
+        """
+        with self._message_cache_lock:
+            cached = self._message_cache.get(message_id)
+            if cached is None:
+                return None
+            if time.monotonic() - cached[0] >= _MESSAGE_CACHE_TTL:
+                self._message_cache.pop(message_id, None)
+                return None
+        return copy.deepcopy(cached[1])
+
+    def _store_message(self, message_id: str, message: dict[str, Any]) -> dict[str, Any]:
+        """
+        Caches a copy of a formatted message, evicting the oldest entry once the cache is full.
+        """
+        entry = (time.monotonic(), copy.deepcopy(message))
+        with self._message_cache_lock:
+            if len(self._message_cache) >= _MESSAGE_CACHE_SIZE:
+                self._message_cache.pop(next(iter(self._message_cache)), None)
+            self._message_cache[message_id] = entry
+        return message
+
+    def _drop_messages(self, message_ids: list[str] | tuple[str, ...]) -> None:
+        """
+        Removes messages changed or deleted through this app from the formatted-message cache.
+        """
+        with self._message_cache_lock:
+            for message_id in message_ids:
+                self._message_cache.pop(message_id, None)
+
+    @_io_steps
+    def _batch(self, requests: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Runs several Gmail API calls through the Gmail batch endpoint, sending up to 50 of them per HTTP request instead of one request each.
 
-        # Extract headers
+        Args:
+            requests: The calls to make, each a dictionary with a percent-encoded 'path' starting with /gmail/v1/ (including any query string), an optional HTTP 'method' (GET, POST, PUT, PATCH or DELETE; default GET) and an optional JSON 'body'
+
+        Returns:
+            A list with one dictionary per call, in request order, holding its HTTP 'status' and decoded JSON 'body';
+            GET, PUT and DELETE calls answered with 429 or 5xx are re-sent first, and keep that status if they never succeed
+
+        Raises:
+            ValueError: When a call has no path, a path outside the Gmail API or containing whitespace or control characters, or an unsupported method
+            HTTPStatusError: When a batch request itself is rejected by the Gmail API
+        """
+        sub_requests = self._batch_sub_requests(requests)
+        results = []
+        for i in range(0, len(sub_requests), _BATCH_LIMIT):
+            chunk = yield _call("_send_sub_requests", sub_requests[i : i + _BATCH_LIMIT])
+            results.extend({"status": status, "body": body} for status, body in chunk)
+        self._forget_batch_writes(sub_requests)
+        return results
+
+    def _batch_sub_requests(self, requests: list[dict[str, Any]]) -> list[tuple[str, str, Any]]:
+        """
+        Validates the calls passed to _batch and turns them into (method, path, body) sub-requests.
+        """
+        sub_requests = []
+        for request in requests:
+            path = request.get("path")
+            if not path or not path.startswith("/gmail/v1/"):
+                raise ValueError(f"Batch request paths must start with /gmail/v1/, got {path!r}")
+            if _UNSAFE_PATH.search(path):
+                raise ValueError(f"Batch request paths must not contain whitespace or control characters, got {path!r}")
+            method = request.get("method", "GET").upper()
+            if method not in _BATCH_METHODS:
+                raise ValueError(f"Batch request methods must be one of {sorted(_BATCH_METHODS)}, got {method!r}")
+            sub_requests.append((method, path, request.get("body")))
+        return sub_requests
+
+    def _forget_batch_writes(self, sub_requests: list[tuple[str, str, Any]]) -> None:
+        """
+        Drops every cached read after a batch that changed data, since its paths can touch any resource.
+        """
+        if all(method == "GET" for method, _, _ in sub_requests):
+            return
+        with self._read_cache_lock:
+            self._read_cache.clear()
+        with self._message_cache_lock:
+            self._message_cache.clear()
+        self._labels_cache = None
+
+    @_io_steps
+    def _send_sub_requests(self, sub_requests: list[tuple[str, str, Any]]) -> list[tuple[int | None, Any]]:
+        """
+        Sends at most _BATCH_LIMIT sub-requests as one batch, then re-sends (with backoff) the idempotent ones Gmail answered with 429 or 5xx.
+
+        Args:
+            sub_requests: The (method, path, body) sub-requests to send
+
+        Returns:
+            The (status, decoded body) of every sub-request, in request order; a sub-request that never
+            succeeded keeps its last status, and one missing from the response has status None
+
+        Raises:
+            HTTPStatusError: When a batch request itself is rejected by the Gmail API
+        """
+        results: list[tuple[int | None, Any]] = [(None, None)] * len(sub_requests)
+        pending = list(range(len(sub_requests)))
+        for attempt in range(_RETRY_ATTEMPTS):
+            chunk = [sub_requests[i] for i in pending]
+            headers, content = _build_batch_request(chunk)
+            idempotent = all(method in _IDEMPOTENT_METHODS for method, _, _ in chunk)
+            response = yield _call("_send_batch", content, headers, idempotent)
+            if response.status_code >= 400:
+                response.raise_for_status()
+            responses = _parse_batch_response(response.headers["Content-Type"], response.content)
+            retry = []
+            for n, i in enumerate(pending):
+                results[i] = responses.get(f"item-{n}", (None, None))
+                if results[i][0] in _RETRY_STATUSES and sub_requests[i][0] in _IDEMPOTENT_METHODS:
+                    retry.append(i)
+            if not retry or attempt == _RETRY_ATTEMPTS - 1:
+                break
+            delay = _retry_delay(response, attempt)
+            logger.warning("Gmail rate limited {} of {} batch sub-requests, retrying them in {:.1f}s", len(retry), len(sub_requests), delay)
+            yield _call("_sleep", delay)
+            pending = retry
+        return results
+
+    def get_messages_batch(self, message_ids: list[str], format: str = "metadata", profile: str | None = None) -> list[dict[str, Any]]:
+        """
+        Retrieves several Gmail messages at once using the Gmail batch endpoint, sending up to 50 message lookups per HTTP request instead of one request per message.
+
+        Args:
+            message_ids: The unique identifiers of the Gmail messages to retrieve
+            format: Format of the returned messages (options: minimal, full, raw, metadata). Defaults to 'metadata', which only includes the From, To, Date and Subject headers
+            profile: Optional partial-response profile limiting the returned fields (options: ids, summary, headers, formatted). Defaults to the complete resource
+
+        Returns:
+            A list of raw Gmail message resources in the same order as the requested IDs; messages that could not be retrieved (e.g. deleted ones) are omitted
+
+        Raises:
+            ValueError: When the profile is not one of the supported options
+            HTTPStatusError: When a batch request is rejected by the Gmail API, or lookups are still rate limited after retrying
+
+        Tags:
+            retrieve, email, messages, batch, gmail, api, important, readOnlyHint
+        """
+        fields = self._profile_fields(profile)
+        chunks = [
+            message_ids[i : i + _BATCH_LIMIT]
+            for i in range(0, len(message_ids), _BATCH_LIMIT)
+        ]
+        if len(chunks) <= 1:
+            results = [self._batch_get_messages(chunk, format, fields) for chunk in chunks]
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(chunks), _BATCH_CONCURRENCY)) as executor:
+                results = list(
+                    executor.map(lambda chunk: self._batch_get_messages(chunk, format, fields), chunks)
+                )
+        return [message for chunk in results for message in chunk]
+
+    @_io_steps
+    def get_minimal_messages(self, message_ids: list[str]) -> list[MinimalMessage]:
+        """
+        Retrieves the IDs, labels and snippets of several messages as compact MinimalMessage tuples, for code that iterates over many messages.
+
+        Args:
+            message_ids: The unique identifiers of the Gmail messages to retrieve
+
+        Returns:
+            A list of MinimalMessage tuples in the same order as the requested IDs; messages that could not be retrieved are omitted
+
+        Raises:
+            HTTPStatusError: When the batch request itself is rejected by the Gmail API
+        """
+        messages = yield _call("get_messages_batch", message_ids, format="minimal")
+        return [MinimalMessage.from_resource(message) for message in messages]
+
+    def _profile_fields(self, profile: str | None) -> str | None:
+        """
+        Returns the partial-response field mask of a get_messages_batch profile.
+        """
+        if profile is None:
+            return None
+        try:
+            return _FIELD_PROFILES[profile]
+        except KeyError:
+            raise ValueError(f"Unknown profile {profile!r}; expected one of {', '.join(_FIELD_PROFILES)}") from None
+
+    @_io_steps
+    def _batch_get_messages(self, message_ids: list[str], format: str, fields: str | None = None) -> list[dict[str, Any]]:
+        """
+        Fetches a single batch of at most _BATCH_LIMIT messages through the Gmail batch endpoint.
+
+        Args:
+            message_ids: The message IDs to fetch, at most _BATCH_LIMIT
+            format: Format of the returned messages
+            fields: Optional partial-response field mask applied to every message
+
+        Returns:
+            list: The retrieved message resources, in request order
+
+        Raises:
+            HTTPStatusError: When the batch is rejected, or some lookups still fail with 429 or 5xx after retrying
+        """
+        sub_requests = [("GET", _message_path(message_id, format, fields), None) for message_id in message_ids]
+        results = yield _call("_send_sub_requests", sub_requests)
+        failed = [message_id for message_id, (status, _) in zip(message_ids, results) if status in _RETRY_STATUSES]
+        if failed:
+            # Returning fewer messages here would look like a complete answer to the caller
+            status = next(status for status, _ in results if status in _RETRY_STATUSES)
+            request = httpx.Request("POST", _BATCH_URL)
+            raise httpx.HTTPStatusError(
+                f"Gmail kept answering {status} for {len(failed)} message lookups: {', '.join(failed)}",
+                request=request,
+                response=httpx.Response(status, request=request),
+            )
+        return _collect_batch_messages(message_ids, results)
+
+    def _format_message(self, raw_data: dict[str, Any], message_id: str | None = None) -> dict[str, Any]:
+        """
+        Reduces a raw Gmail message resource to the fields exposed by the message tools.
+
+        Args:
+            raw_data: The message resource returned by the Gmail API
+            message_id: The ID the message was requested with; defaults to the ID in the resource
+
+        Returns:
+            dict: The cleaned message details (serializable as JSON)
+        """
+        # Extract only the headers used below, stopping once all of them were found
         headers = {}
-        for header in raw_data.get("payload", {}).get("headers", []):
-            name = header.get("name", "")
-            value = header.get("value", "")
-            headers[name] = value
+        for header in raw_data.get("payload", {}).get("headers", ()):
+            name = header.get("name")
+            if name in _MESSAGE_HEADER_SET:
+                headers[name] = header.get("value", "")
+                if len(headers) == len(_MESSAGE_HEADER_SET):
+                    break
 
         # Extract body content
         body_content = self._extract_email_body(raw_data.get("payload", {}))
@@ -241,7 +1100,7 @@ class GoogleMailApp(APIApplication):
                 body_content = "No content available"
 
         return{
-            "message_id":message_id,
+            "message_id":message_id or raw_data.get("id"),
             "from_addr":headers.get("From", "Unknown sender"),
             "to":headers.get("To", "Unknown recipient"),
             "date":headers.get("Date", "Unknown date"),
@@ -302,7 +1161,7 @@ class GoogleMailApp(APIApplication):
             return ""
             
         except Exception as e:
-            logger.error(f"Error extracting email body: {str(e)}")
+            logger.error("Error extracting email body: {}", e)
             return ""
     
     def _decode_base64(self, data):
@@ -320,9 +1179,10 @@ class GoogleMailApp(APIApplication):
             decoded_bytes = base64.urlsafe_b64decode(data)
             return decoded_bytes.decode('utf-8')
         except Exception as e:
-            logger.error(f"Error decoding base64 data: {str(e)}")
+            logger.error("Error decoding base64 data: {}", e)
             return f"[Unable to decode content: {str(e)}]"
 
+    @_io_steps
     def list_messages(
         self, max_results: int = 10, q: str | None = None, include_spam_trash: bool = False, page_token: str | None = None
     ) ->dict[str, Any]:
@@ -361,7 +1221,7 @@ class GoogleMailApp(APIApplication):
         Tags:
             list, messages, gmail, search, query, pagination, important
         """
-        url = f"{self.base_api_url}/messages?format=metadata"
+        url = self._url_messages
 
         # Build query parameters
         params: dict[str, Any] = {"maxResults": max_results}
@@ -375,43 +1235,175 @@ class GoogleMailApp(APIApplication):
         if page_token:
             params["pageToken"] = page_token
 
-        logger.info(f"Retrieving messages list with params: {params}")
+        logger.info("Retrieving messages list with params: {}", params)
 
-        response = self._get(url, params=params)
-        data = self._handle_response(response)
+        data = yield _call("_get_json", url, params)
         
         # Extract message IDs
         messages = data.get("messages", [])
         message_ids = [msg.get("id") for msg in messages if msg.get("id")]
         
-        # Use ThreadPoolExecutor to get detailed information for each message in parallel
-        detailed_messages = []
-        if message_ids:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                # Submit all get_message calls
-                future_to_message_id = {
-                    executor.submit(self.get_message, message_id): message_id 
-                    for message_id in message_ids
-                }
-                
-                # Collect results as they complete
-                for future in concurrent.futures.as_completed(future_to_message_id):
-                    message_id = future_to_message_id[future]
-                    try:
-                        result = future.result()
-                        detailed_messages.append(result)
-                    except Exception as e:
-                        logger.error(f"Error retrieving message {message_id}: {str(e)}")
-                        # Skip failed messages rather than including error strings
-        
+        # Fetch full message details with batched requests instead of one call per message
+        fetched = yield _call("get_messages_batch", message_ids, format="full", profile="formatted")
+        detailed_messages = [self._format_message(message) for message in fetched]
+
         return {
             "messages": detailed_messages,
             "next_page_token": data.get("nextPageToken")
         }
 
+    def list_all_messages(
+        self, q: str | None = None, total: int = 100, include_spam_trash: bool = False
+    ) -> dict[str, Any]:
+        """
+        Retrieves up to `total` messages across as many result pages as needed, listing the next page while the current page's messages are being fetched.
+
+        Args:
+            q: Search query string to filter messages using Gmail search syntax (same syntax as list_messages)
+            total: Maximum number of messages to return across all pages (default 100); values below 1 return no messages without calling Gmail
+            include_spam_trash: Boolean flag to include messages from spam and trash folders (default False)
+
+        Returns:
+            A dictionary containing the list of messages and the token of the next unread page, if any
+
+        Raises:
+            HTTPStatusError: When a Gmail API request fails
+
+        Tags:
+            list, messages, gmail, search, query, pagination, readOnlyHint
+        """
+        if total < 1:
+            # Gmail rejects maxResults=0
+            return {"messages": [], "next_page_token": None}
+        url = self._url_messages
+        base_params: dict[str, Any] = {}
+        if q:
+            base_params["q"] = q
+        if include_spam_trash:
+            base_params["includeSpamTrash"] = "true"
+
+        def fetch_page(page_token: str | None, remaining: int) -> dict[str, Any]:
+            params = {**base_params, "maxResults": min(remaining, 500)}
+            if page_token:
+                params["pageToken"] = page_token
+            return self._get_json(url, params)
+
+        messages = []
+        remaining = total
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            page = fetch_page(None, remaining)
+            while True:
+                message_ids = [msg["id"] for msg in page.get("messages", []) if msg.get("id")]
+                remaining -= len(message_ids)
+                next_page_token = page.get("nextPageToken")
+                # List the next page while this page's messages are being fetched
+                next_page = None
+                if next_page_token and remaining > 0:
+                    next_page = executor.submit(fetch_page, next_page_token, remaining)
+                messages.extend(
+                    self._format_message(message)
+                    for message in self.get_messages_batch(message_ids, format="full", profile="formatted")
+                )
+                if next_page is None:
+                    break
+                page = next_page.result()
+
+        return {"messages": messages, "next_page_token": next_page_token}
+
+    @_io_steps
+    def list_messages_since(self, history_id: str | None = None, max_results: int = 100) -> dict[str, Any]:
+        """
+        Retrieves only the messages added to the mailbox since a previously seen history ID, instead of re-listing the whole mailbox.
+
+        Args:
+            history_id: History ID returned by a previous call (or by get_profile). Defaults to the last history ID seen by this app; when none is known, or Gmail no longer has history that old, a regular listing is returned instead
+            max_results: Maximum number of messages to return for the fallback listing (default 100)
+
+        Returns:
+            A dictionary containing the new messages and the history ID to pass to the next call
+
+        Raises:
+            HTTPStatusError: When a Gmail API request fails
+
+        Tags:
+            list, messages, gmail, history, sync, incremental, readOnlyHint
+        """
+        start_history_id = history_id or self._last_history_id
+        if start_history_id is None:
+            return (yield _call("_list_messages_baseline", max_results))
+
+        message_ids: dict[str, None] = {}
+        page_token = None
+        try:
+            while True:
+                history = yield _call(
+                    "list_history",
+                    "me",
+                    startHistoryId=start_history_id,
+                    historyTypes="messageAdded",
+                    pageToken=page_token,
+                )
+                for record in history.get("history", []):
+                    for added in record.get("messagesAdded", []):
+                        message_id = added.get("message", {}).get("id")
+                        if message_id:
+                            message_ids[message_id] = None
+                page_token = history.get("nextPageToken")
+                if not page_token:
+                    break
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            # The start ID is older than the history Gmail keeps
+            logger.info("History {} is no longer available, listing messages instead", start_history_id)
+            return (yield _call("_list_messages_baseline", max_results))
+
+        self._last_history_id = history.get("historyId", start_history_id)
+        messages = yield _call("get_messages_batch", list(message_ids), format="full", profile="formatted")
+        messages = [self._format_message(message) for message in messages]
+        return {"messages": messages, "history_id": self._last_history_id}
+
+    @_io_steps
+    def _list_messages_baseline(self, max_results: int) -> dict[str, Any]:
+        """
+        Lists the latest messages and records the mailbox history ID taken just before the listing.
+        """
+        self.invalidate_profile()
+        profile = yield _call("get_profile")
+        result = yield _call("list_messages", max_results=max_results)
+        history_id = profile.get("historyId")
+        return {"messages": result["messages"], "history_id": history_id}
+
+    def iter_history(self, userId: str = "me", **kwargs: Any) -> Iterator[dict[str, Any]]:
+        """
+        Yields the mailbox history records of every list_history page, fetching the next page in the background while the current one is consumed.
+
+        Args:
+            userId: The user whose history to read (default "me")
+            **kwargs: Further list_history arguments, e.g. startHistoryId, historyTypes or labelId
+
+        Returns:
+            An iterator over the history records, in chronological order
+
+        Raises:
+            HTTPStatusError: When a Gmail API request fails
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            page = self.list_history(userId, **kwargs)
+            while True:
+                next_page_token = page.get("nextPageToken")
+                next_page = None
+                if next_page_token:
+                    next_page = executor.submit(self.list_history, userId, **{**kwargs, "pageToken": next_page_token})
+                yield from page.get("history", [])
+                if next_page is None:
+                    return
+                page = next_page.result()
+
+    @_io_steps
     def get_thread(self, thread_id: str) -> dict[str, Any]:
         """
-        Retrieves a specific thread and all its messages from Gmail API.
+        Retrieves a specific thread and all its messages from Gmail API. The thread is reused for up to 30 seconds, so messages added from elsewhere in that time may be missing; writes through this app discard it right away.
 
         Args:
             thread_id: The unique identifier of the Gmail thread to retrieve
@@ -427,14 +1419,14 @@ class GoogleMailApp(APIApplication):
         Tags:
             retrieve, email, thread, gmail, api, conversation, important, readOnlyHint, openWorldHint
         """
-        url = f"{self.base_api_url}/threads/{thread_id}"
-        logger.info(f"Retrieving thread {thread_id}")
-        response = self._get(url)
-        return self._handle_response(response)
+        url = self._url_threads + "/" + thread_id
+        logger.info("Retrieving thread {}", thread_id)
+        return (yield _call("_cached_get", url))
 
+    @_io_steps
     def list_labels(self) -> dict[str, Any]:
         """
-        Retrieves and formats a list of all labels (both system and user-created) from the user's Gmail account, organizing them by type and sorting them alphabetically.
+        Retrieves and formats a list of all labels (both system and user-created) from the user's Gmail account, organizing them by type and sorting them alphabetically. Results are reused for up to 60 seconds unless a label is created, updated or deleted through this app.
 
         Args:
             None: This method takes no arguments
@@ -450,14 +1442,21 @@ class GoogleMailApp(APIApplication):
             list, gmail, labels, fetch, organize, important, management
         """
         
-        url = f"{self.base_api_url}/labels"
+        cached = self._labels_cache
+        if cached is not None and time.monotonic() - cached[0] < _LABELS_TTL:
+            return copy.deepcopy(cached[1])
 
-        logger.info("Retrieving Gmail labels")
+        url = self._url_labels
 
-        response = self._get(url)
+        logger.info("Retrieving Gmail labels")
 
-        return self._handle_response(response)
+        labels = yield _call("_get_json", url)
+        # System labels sort before user labels, each group alphabetically
+        labels.get("labels", []).sort(key=lambda label: (label.get("type", ""), label.get("name", "")))
+        self._labels_cache = (time.monotonic(), copy.deepcopy(labels))
+        return labels
 
+    @_io_steps
     def create_label(self, name: str) -> dict[str, Any]:
         """
         Creates a new Gmail label with specified visibility settings and returns creation status details.
@@ -476,7 +1475,7 @@ class GoogleMailApp(APIApplication):
             create, label, gmail, management, important
         """
 
-        url = f"{self.base_api_url}/labels"
+        url = self._url_labels
 
             # Create the label data with just the essential fields
         label_data = {
@@ -485,15 +1484,17 @@ class GoogleMailApp(APIApplication):
                 "messageListVisibility": "show",  # Show in message list
             }
 
-        logger.info(f"Creating new Gmail label: {name}")
+        logger.info("Creating new Gmail label: {}", name)
 
-        response = self._post(url, label_data)
+        response = yield _call("_post", url, label_data)
+        self._labels_cache = None
 
         return self._handle_response(response)
 
+    @_io_steps
     def get_profile(self) -> dict[str, Any]:
         """
-        Retrieves and formats the user's Gmail profile information including email address, message count, thread count, and history ID.
+        Retrieves and formats the user's Gmail profile information including email address, message count, thread count, and history ID. The profile is reused for up to 5 minutes; counters may lag behind the mailbox by that much.
 
         Args:
             None: This method takes no arguments besides self
@@ -509,16 +1510,79 @@ class GoogleMailApp(APIApplication):
             fetch, profile, gmail, user-info, api-request, important
         """
         
-        url = f"{self.base_api_url}/profile"
+        cached = self._profile_cache
+        if cached is not None and time.monotonic() - cached[0] < _PROFILE_TTL:
+            return copy.deepcopy(cached[1])
+
+        url = self._url_profile
 
         logger.info("Retrieving Gmail user profile")
 
-        response = self._get(url)
-        return self._handle_response(response)
+        profile = yield _call("_get_json", url)
+        self._profile_cache = (time.monotonic(), copy.deepcopy(profile))
+        self._last_history_id = profile.get("historyId", self._last_history_id)
+        return profile
 
+    def invalidate_profile(self) -> None:
+        """
+        Discards the cached profile so the next get_profile call fetches fresh counters from Gmail.
+        """
+        self._profile_cache = None
 
+    @_io_steps
+    def get_all_settings(self, userId: str = "me") -> dict[str, Any]:
+        """
+        Retrieves the IMAP, POP, vacation responder, language and auto-forwarding settings of a mailbox in a single batch request. When every setting is retrieved, the result is reused for up to 30 seconds, or until a write through this app touches the mailbox.
 
+        Args:
+            userId: The user's email address, or 'me' for the authenticated user
+
+        Returns:
+            A dictionary keyed by setting name (imap, pop, vacation, language, autoForwarding) holding each settings resource; settings that could not be retrieved are omitted
+
+        Raises:
+            HTTPStatusError: When the batch request itself is rejected by the Gmail API
 
+        Tags:
+            retrieve, settings, batch, gmail, api, readOnlyHint
+        """
+        key = self._settings_cache_key(userId)
+        settings = self._cached_read(key)
+        if settings is None:
+            results = yield _call("_batch", self._settings_requests(userId))
+            settings = self._collect_settings(results)
+            # Partial results (a sub-request failed or was rate limited) are not cached
+            if len(settings) == len(_SETTINGS_ENDPOINTS):
+                self._store_read(key, settings)
+        return settings
+
+    def _settings_cache_key(self, userId: str) -> tuple:
+        """
+        Returns the read-cache key of a user's combined settings, so invalidate_user also drops them.
+        """
+        return _read_cache_key(f"{self._users_prefix}/{userId}/settings/", None)
+
+    def _settings_requests(self, userId: str) -> list[dict[str, Any]]:
+        """
+        Builds the batch calls for the settings fetched by get_all_settings.
+        """
+        prefix = f"/gmail/v1/users/{_path_segment(userId)}/settings/"
+        return [{"path": prefix + name} for name in _SETTINGS_ENDPOINTS]
+
+    def _collect_settings(self, results: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Maps batch results back to their setting names, dropping failed calls.
+        """
+        return {
+            name: result["body"]
+            for name, result in zip(_SETTINGS_ENDPOINTS, results)
+            if result["status"] == 200
+        }
+
+
+
+
+    @_io_steps
     def update_drafts(self, userId, id, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None, message=None) -> dict[str, Any]:
         """
         Updates an existing Gmail draft with new message content and metadata.
@@ -596,19 +1660,18 @@ class GoogleMailApp(APIApplication):
             raise ValueError("Missing required parameter 'userId'")
         if id is None:
             raise ValueError("Missing required parameter 'id'")
-        request_body = {
-            'id': id,
-            'message': message,
-        }
-        request_body = {k: v for k, v in request_body.items() if v is not None}
-        url = f"{self.base_url}/gmail/v1/users/{userId}/drafts/{id}"
-        query_params = {k: v for k, v in [('access_token', access_token), ('alt', alt), ('callback', callback), ('fields', fields), ('key', key), ('oauth_token', oauth_token), ('prettyPrint', prettyPrint), ('quotaUser', quotaUser), ('upload_protocol', upload_protocol), ('uploadType', uploadType), ('$.xgafv', xgafv)] if v is not None}
-        response = self._put(url, data=request_body, params=query_params)
-        response.raise_for_status()
-        return response.json()
+        request_body = {'id': id}
+        if message is not None:
+            request_body['message'] = message
+        url = f"{self._users_prefix}/{userId}/drafts/{id}"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        response = yield _call("_put", url, request_body, query_params)
+        self.invalidate_user(userId)
+        return self._finish(response)
 
 
 
+    @_io_steps
     def trash_messsages(self, userId, id, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None) -> dict[str, Any]:
         """
         Moves a message to the trash folder (acts like delete functionality).
@@ -638,12 +1701,14 @@ class GoogleMailApp(APIApplication):
             raise ValueError("Missing required parameter 'userId'")
         if id is None:
             raise ValueError("Missing required parameter 'id'")
-        url = f"{self.base_url}/gmail/v1/users/{userId}/messages/{id}/trash"
-        query_params = {k: v for k, v in [('access_token', access_token), ('alt', alt), ('callback', callback), ('fields', fields), ('key', key), ('oauth_token', oauth_token), ('prettyPrint', prettyPrint), ('quotaUser', quotaUser), ('upload_protocol', upload_protocol), ('uploadType', uploadType), ('$.xgafv', xgafv)] if v is not None}
-        response = self._post(url, data={}, params=query_params)
-        response.raise_for_status()
-        return response.json()
-
+        url = f"{self._users_prefix}/{userId}/messages/{id}/trash"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        response = yield _call("_post", url, {}, query_params)
+        self.invalidate_user(userId)
+        self._drop_messages((id,))
+        return self._finish(response)
+
+    @_io_steps
     def untrash_messages(self, userId, id, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None) -> dict[str, Any]:
         """
         Moves a message out of the trash, effectively undoing a trash action and restoring the message to the user's mailbox.
@@ -673,16 +1738,113 @@ class GoogleMailApp(APIApplication):
             raise ValueError("Missing required parameter 'userId'")
         if id is None:
             raise ValueError("Missing required parameter 'id'")
-        url = f"{self.base_url}/gmail/v1/users/{userId}/messages/{id}/untrash"
-        query_params = {k: v for k, v in [('access_token', access_token), ('alt', alt), ('callback', callback), ('fields', fields), ('key', key), ('oauth_token', oauth_token), ('prettyPrint', prettyPrint), ('quotaUser', quotaUser), ('upload_protocol', upload_protocol), ('uploadType', uploadType), ('$.xgafv', xgafv)] if v is not None}
-        response = self._post(url, data={}, params=query_params)
-        response.raise_for_status()
-        return response.json()
+        url = f"{self._users_prefix}/{userId}/messages/{id}/untrash"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        response = yield _call("_post", url, {}, query_params)
+        self.invalidate_user(userId)
+        self._drop_messages((id,))
+        return self._finish(response)
 
  
  
   
 
+    @_io_steps
+    def batch_modify_messages(self, userId, ids, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None, addLabelIds=None, removeLabelIds=None) -> Any:
+        """
+        Adds or removes labels on many messages at once, sending one request per 1000 message IDs instead of modifying them one call at a time.
+
+        Args:
+            userId (string): userId
+            ids (array): The IDs of the messages to modify. Example: "['18c1f2e3a4b5c6d7']".
+            access_token (string): OAuth access token. Example: '{{access_token}}'.
+            alt (string): Data format for response. Example: '{{alt}}'.
+            callback (string): JSONP Example: '{{callback}}'.
+            fields (string): Selector specifying which fields to include in a partial response. Example: '{{fields}}'.
+            key (string): API key. Your API key identifies your project and provides you with API access, quota, and reports. Required unless you provide an OAuth 2.0 token. Example: '{{key}}'.
+            oauth_token (string): OAuth 2.0 token for the current user. Example: '{{oauth_token}}'.
+            prettyPrint (string): Returns response with indentations and line breaks. Example: '{{prettyPrint}}'.
+            quotaUser (string): Available to use for quota purposes for server-side applications. Can be any arbitrary string assigned to a user, but should not exceed 40 characters. Example: '{{quotaUser}}'.
+            upload_protocol (string): Upload protocol for media (e.g. "raw", "multipart"). Example: '{{upload_protocol}}'.
+            uploadType (string): Legacy upload protocol for media (e.g. "media", "multipart"). Example: '{{uploadType}}'.
+            xgafv (string): V1 error format. Example: '{{$.xgafv}}'.
+            addLabelIds (array): Label IDs to add to the messages. Example: "['STARRED']".
+            removeLabelIds (array): Label IDs to remove from the messages, e.g. 'UNREAD' to mark them as read. Example: "['UNREAD']".
+
+        Returns:
+            Any: No Content
+
+        Tags:
+            Messages, batch
+        """
+        if userId is None:
+            raise ValueError("Missing required parameter 'userId'")
+        if ids is None:
+            raise ValueError("Missing required parameter 'ids'")
+        request_body = {}
+        if addLabelIds is not None:
+            request_body['addLabelIds'] = addLabelIds
+        if removeLabelIds is not None:
+            request_body['removeLabelIds'] = removeLabelIds
+        url = f"{self._users_prefix}/{userId}/messages/batchModify"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        result = None
+        for i in range(0, len(ids), _BATCH_MODIFY_LIMIT):
+            chunk = ids[i : i + _BATCH_MODIFY_LIMIT]
+            response = yield _call("_post", url, {'ids': chunk, **request_body}, query_params)
+            self.invalidate_user(userId)
+            self._drop_messages(chunk)
+            result = self._finish(response)
+        return result
+
+    @_io_steps
+    def list_history(self, userId, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None, historyTypes=None, labelId=None, maxResults=None, pageToken=None, startHistoryId=None) -> dict[str, Any]:
+        """
+        Lists the history of all changes to the mailbox since a given history ID, in chronological order.
+
+        Args:
+            userId (string): userId
+            access_token (string): OAuth access token. Example: '{{access_token}}'.
+            alt (string): Data format for response. Example: '{{alt}}'.
+            callback (string): JSONP Example: '{{callback}}'.
+            fields (string): Selector specifying which fields to include in a partial response. Example: '{{fields}}'.
+            key (string): API key. Your API key identifies your project and provides you with API access, quota, and reports. Required unless you provide an OAuth 2.0 token. Example: '{{key}}'.
+            oauth_token (string): OAuth 2.0 token for the current user. Example: '{{oauth_token}}'.
+            prettyPrint (string): Returns response with indentations and line breaks. Example: '{{prettyPrint}}'.
+            quotaUser (string): Available to use for quota purposes for server-side applications. Can be any arbitrary string assigned to a user, but should not exceed 40 characters. Example: '{{quotaUser}}'.
+            upload_protocol (string): Upload protocol for media (e.g. "raw", "multipart"). Example: '{{upload_protocol}}'.
+            uploadType (string): Legacy upload protocol for media (e.g. "media", "multipart"). Example: '{{uploadType}}'.
+            xgafv (string): V1 error format. Example: '{{$.xgafv}}'.
+            historyTypes (string): History types to be returned by the function (messageAdded, messageDeleted, labelAdded, labelRemoved). Example: 'messageAdded'.
+            labelId (string): Only return messages with a label matching the ID. Example: 'INBOX'.
+            maxResults (number): Maximum number of history records to return (default 100, max 500). Example: '100'.
+            pageToken (string): Page token to retrieve a specific page of results in the list. Example: '{{pageToken}}'.
+            startHistoryId (string): Required. Returns history records after the specified history ID. Example: '{{startHistoryId}}'.
+
+        Returns:
+            dict[str, Any]: Successful response
+
+        Tags:
+            History
+        """
+        if userId is None:
+            raise ValueError("Missing required parameter 'userId'")
+        url = f"{self._users_prefix}/{userId}/history"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        if historyTypes is not None:
+            query_params['historyTypes'] = historyTypes
+        if labelId is not None:
+            query_params['labelId'] = labelId
+        if maxResults is not None:
+            query_params['maxResults'] = maxResults
+        if pageToken is not None:
+            query_params['pageToken'] = pageToken
+        if startHistoryId is not None:
+            query_params['startHistoryId'] = startHistoryId
+        response = yield _call("_get", url, query_params)
+        return self._finish(response)
+
+    @_io_steps
     def get_attachments(self, userId, messageId, id, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None) -> dict[str, Any]:
         """
         Retrieves the actual file content of a specific attachment from a Gmail message
@@ -715,13 +1877,12 @@ class GoogleMailApp(APIApplication):
             raise ValueError("Missing required parameter 'messageId'")
         if id is None:
             raise ValueError("Missing required parameter 'id'")
-        url = f"{self.base_url}/gmail/v1/users/{userId}/messages/{messageId}/attachments/{id}"
-        query_params = {k: v for k, v in [('access_token', access_token), ('alt', alt), ('callback', callback), ('fields', fields), ('key', key), ('oauth_token', oauth_token), ('prettyPrint', prettyPrint), ('quotaUser', quotaUser), ('upload_protocol', upload_protocol), ('uploadType', uploadType), ('$.xgafv', xgafv)] if v is not None}
-        response = self._get(url, params=query_params)
-        response.raise_for_status()
-        return response.json()
+        url = f"{self._users_prefix}/{userId}/messages/{messageId}/attachments/{id}"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        return (yield _call("_get_json", url, query_params))
 
 
+    @_io_steps
     def update_labels(self, userId, id, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None, color=None, labelListVisibility=None, messageListVisibility=None, messagesTotal=None, messagesUnread=None, name=None, threadsTotal=None, threadsUnread=None, type=None) -> dict[str, Any]:
         """
         Update an existing Gmail label's properties such as name, color, or visibility.
@@ -778,25 +1939,33 @@ class GoogleMailApp(APIApplication):
             raise ValueError("Missing required parameter 'userId'")
         if id is None:
             raise ValueError("Missing required parameter 'id'")
-        request_body = {
-            'color': color,
-            'id': id,
-            'labelListVisibility': labelListVisibility,
-            'messageListVisibility': messageListVisibility,
-            'messagesTotal': messagesTotal,
-            'messagesUnread': messagesUnread,
-            'name': name,
-            'threadsTotal': threadsTotal,
-            'threadsUnread': threadsUnread,
-            'type': type,
-        }
-        request_body = {k: v for k, v in request_body.items() if v is not None}
-        url = f"{self.base_url}/gmail/v1/users/{userId}/labels/{id}"
-        query_params = {k: v for k, v in [('access_token', access_token), ('alt', alt), ('callback', callback), ('fields', fields), ('key', key), ('oauth_token', oauth_token), ('prettyPrint', prettyPrint), ('quotaUser', quotaUser), ('upload_protocol', upload_protocol), ('uploadType', uploadType), ('$.xgafv', xgafv)] if v is not None}
-        response = self._put(url, data=request_body, params=query_params)
-        response.raise_for_status()
-        return response.json()
-
+        request_body = {'id': id}
+        if color is not None:
+            request_body['color'] = color
+        if labelListVisibility is not None:
+            request_body['labelListVisibility'] = labelListVisibility
+        if messageListVisibility is not None:
+            request_body['messageListVisibility'] = messageListVisibility
+        if messagesTotal is not None:
+            request_body['messagesTotal'] = messagesTotal
+        if messagesUnread is not None:
+            request_body['messagesUnread'] = messagesUnread
+        if name is not None:
+            request_body['name'] = name
+        if threadsTotal is not None:
+            request_body['threadsTotal'] = threadsTotal
+        if threadsUnread is not None:
+            request_body['threadsUnread'] = threadsUnread
+        if type is not None:
+            request_body['type'] = type
+        url = f"{self._users_prefix}/{userId}/labels/{id}"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        response = yield _call("_put", url, request_body, query_params)
+        self._labels_cache = None
+        self.invalidate_user(userId)
+        return self._finish(response)
+
+    @_io_steps
     def delete_labels(self, userId, id, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None) -> Any:
         """
         Delete a Gmail label by its ID.
@@ -826,18 +1995,20 @@ class GoogleMailApp(APIApplication):
             raise ValueError("Missing required parameter 'userId'")
         if id is None:
             raise ValueError("Missing required parameter 'id'")
-        url = f"{self.base_url}/gmail/v1/users/{userId}/labels/{id}"
-        query_params = {k: v for k, v in [('access_token', access_token), ('alt', alt), ('callback', callback), ('fields', fields), ('key', key), ('oauth_token', oauth_token), ('prettyPrint', prettyPrint), ('quotaUser', quotaUser), ('upload_protocol', upload_protocol), ('uploadType', uploadType), ('$.xgafv', xgafv)] if v is not None}
-        response = self._delete(url, params=query_params)
-        response.raise_for_status()
-        return response.json()
+        url = f"{self._users_prefix}/{userId}/labels/{id}"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        response = yield _call("_delete", url, query_params)
+        self._labels_cache = None
+        self.invalidate_user(userId)
+        return self._finish(response)
 
  
  
 
+    @_io_steps
     def get_filters(self, userId, id, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None) -> dict[str, Any]:
         """
-        Fetch Gmail filter configuration and rules by filter ID
+        Fetch Gmail filter configuration and rules by filter ID. The filter is reused for up to 30 seconds unless filters are changed through this app.
 
         Args:
             userId (string): userId
@@ -864,12 +2035,11 @@ class GoogleMailApp(APIApplication):
             raise ValueError("Missing required parameter 'userId'")
         if id is None:
             raise ValueError("Missing required parameter 'id'")
-        url = f"{self.base_url}/gmail/v1/users/{userId}/settings/filters/{id}"
-        query_params = {k: v for k, v in [('access_token', access_token), ('alt', alt), ('callback', callback), ('fields', fields), ('key', key), ('oauth_token', oauth_token), ('prettyPrint', prettyPrint), ('quotaUser', quotaUser), ('upload_protocol', upload_protocol), ('uploadType', uploadType), ('$.xgafv', xgafv)] if v is not None}
-        response = self._get(url, params=query_params)
-        response.raise_for_status()
-        return response.json()
+        url = f"{self._users_prefix}/{userId}/settings/filters/{id}"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        return (yield _call("_cached_get", url, query_params))
 
+    @_io_steps
     def delete_filters(self, userId, id, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None) -> Any:
         """
         Remove Gmail filter and its associated automation rules
@@ -899,15 +2069,16 @@ class GoogleMailApp(APIApplication):
             raise ValueError("Missing required parameter 'userId'")
         if id is None:
             raise ValueError("Missing required parameter 'id'")
-        url = f"{self.base_url}/gmail/v1/users/{userId}/settings/filters/{id}"
-        query_params = {k: v for k, v in [('access_token', access_token), ('alt', alt), ('callback', callback), ('fields', fields), ('key', key), ('oauth_token', oauth_token), ('prettyPrint', prettyPrint), ('quotaUser', quotaUser), ('upload_protocol', upload_protocol), ('uploadType', uploadType), ('$.xgafv', xgafv)] if v is not None}
-        response = self._delete(url, params=query_params)
-        response.raise_for_status()
-        return response.json()
+        url = f"{self._users_prefix}/{userId}/settings/filters/{id}"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        response = yield _call("_delete", url, query_params)
+        self.invalidate_user(userId)
+        return self._finish(response)
 
+    @_io_steps
     def list_filters(self, userId, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None) -> dict[str, Any]:
         """
-        Retrieve all Gmail filters and their automation settings
+        Retrieve all Gmail filters and their automation settings. The list is reused for up to 30 seconds unless filters are changed through this app.
 
         Args:
             userId (string): userId
@@ -931,12 +2102,11 @@ class GoogleMailApp(APIApplication):
         """
         if userId is None:
             raise ValueError("Missing required parameter 'userId'")
-        url = f"{self.base_url}/gmail/v1/users/{userId}/settings/filters"
-        query_params = {k: v for k, v in [('access_token', access_token), ('alt', alt), ('callback', callback), ('fields', fields), ('key', key), ('oauth_token', oauth_token), ('prettyPrint', prettyPrint), ('quotaUser', quotaUser), ('upload_protocol', upload_protocol), ('uploadType', uploadType), ('$.xgafv', xgafv)] if v is not None}
-        response = self._get(url, params=query_params)
-        response.raise_for_status()
-        return response.json()
+        url = f"{self._users_prefix}/{userId}/settings/filters"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        return (yield _call("_cached_get", url, query_params))
 
+    @_io_steps
     def create_filters(self, userId, access_token=None, alt=None, callback=None, fields=None, key=None, oauth_token=None, prettyPrint=None, quotaUser=None, upload_protocol=None, uploadType=None, xgafv=None, action=None, criteria=None, id=None) -> dict[str, Any]:
         """
         Set up new Gmail filter with criteria and automated actions
@@ -994,17 +2164,18 @@ class GoogleMailApp(APIApplication):
         """
         if userId is None:
             raise ValueError("Missing required parameter 'userId'")
-        request_body = {
-            'action': action,
-            'criteria': criteria,
-            'id': id,
-        }
-        request_body = {k: v for k, v in request_body.items() if v is not None}
-        url = f"{self.base_url}/gmail/v1/users/{userId}/settings/filters"
-        query_params = {k: v for k, v in [('access_token', access_token), ('alt', alt), ('callback', callback), ('fields', fields), ('key', key), ('oauth_token', oauth_token), ('prettyPrint', prettyPrint), ('quotaUser', quotaUser), ('upload_protocol', upload_protocol), ('uploadType', uploadType), ('$.xgafv', xgafv)] if v is not None}
-        response = self._post(url, data=request_body, params=query_params)
-        response.raise_for_status()
-        return response.json()
+        request_body = {}
+        if action is not None:
+            request_body['action'] = action
+        if criteria is not None:
+            request_body['criteria'] = criteria
+        if id is not None:
+            request_body['id'] = id
+        url = f"{self._users_prefix}/{userId}/settings/filters"
+        query_params = _common_qs(access_token, alt, callback, fields, key, oauth_token, prettyPrint, quotaUser, upload_protocol, uploadType, xgafv)
+        response = yield _call("_post", url, request_body, query_params)
+        self.invalidate_user(userId)
+        return self._finish(response)
 
     def list_tools(self):
         return [
@@ -1015,15 +2186,21 @@ class GoogleMailApp(APIApplication):
             self.list_drafts,
             self.get_message,
             self.list_messages,
+            self.list_all_messages,
+            self.list_messages_since,
+            self.get_messages_batch,
             self.list_labels,
             self.create_label,
             self.get_profile,
+            self.get_all_settings,
             # Auto Generated from openapi spec
          
             self.update_drafts,
          
             self.trash_messsages,
             self.untrash_messages,
+            self.batch_modify_messages,
+            self.list_history,
          
          
             self.get_attachments,
@@ -1037,3 +2214,260 @@ class GoogleMailApp(APIApplication):
             self.create_filters,
       
         ]
+
+
+@_with_async_steps
+class AsyncGoogleMailApp(GoogleMailApp):
+    """
+    GoogleMailApp whose core Gmail tools are coroutines backed by a shared httpx.AsyncClient,
+    so they can be awaited from async servers and fanned out with asyncio.gather.
+
+    The _io_steps tools and helpers get their coroutines from @_with_async_steps; only the async
+    transport and the methods that schedule concurrent work are written out here.
+    """
+
+    def __init__(self, integration: Integration) -> None:
+        super().__init__(integration=integration)
+        self._async_client: httpx.AsyncClient | None = None
+        self._pending_threads: dict[str, asyncio.Future] = {}
+        self._thread_flush: asyncio.Task | None = None
+        self._thread_loads: set[asyncio.Task] = set()
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        Returns the shared async HTTP client, creating it on first use.
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={**_GZIP_HEADERS, **self._get_headers()},
+                timeout=self.default_timeout,
+                transport=httpx.AsyncHTTPTransport(retries=_CONNECT_RETRIES, limits=_ASYNC_HTTP_LIMITS, http2=_HTTP2),
+            )
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """
+        Closes both the async and the sync pooled HTTP connections.
+        """
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
+
+    async def __aenter__(self) -> "AsyncGoogleMailApp":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _aget(self, url: str, params: dict[str, Any] | None = None) -> httpx.Response:
+        return await self._arequest_with_retry("GET", url, params=params)
+
+    async def _aput(self, url: str, data: Any, params: dict[str, Any] | None = None) -> httpx.Response:
+        content, headers = self._encode_body(_json_dumps(data), _JSON_HEADERS)
+        return await self.async_client.put(url, content=content, params=params, headers=headers)
+
+    async def _adelete(self, url: str, params: dict[str, Any] | None = None) -> httpx.Response:
+        return await self._arequest_with_retry("DELETE", url, params=params)
+
+    async def _arequest_with_retry(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        for attempt in range(_RETRY_ATTEMPTS - 1):
+            response = await self.async_client.request(method, url, **kwargs)
+            if response.status_code not in _RETRY_STATUSES:
+                return response
+            delay = _retry_delay(response, attempt)
+            logger.warning("Gmail returned {} for {} {}, retrying in {:.1f}s", response.status_code, method, url, delay)
+            await asyncio.sleep(delay)
+        return await self.async_client.request(method, url, **kwargs)
+
+    async def _apost(self, url: str, data: Any, params: dict[str, Any] | None = None) -> httpx.Response:
+        content, headers = self._encode_body(_json_dumps(data), _JSON_HEADERS)
+        return await self.async_client.post(url, content=content, params=params, headers=headers)
+
+    async def _aupload_message(self, url: str, metadata: dict[str, Any], mime: bytes | memoryview) -> httpx.Response:
+        headers, content = _build_upload_request(metadata, mime)
+        content, headers = self._encode_body(content, headers)
+        return await self.async_client.post(url, content=content, headers=headers, params={"uploadType": "multipart"})
+
+    async def _asend_batch(self, content: bytes, headers: dict[str, str], idempotent: bool) -> httpx.Response:
+        if idempotent:
+            return await self._arequest_with_retry("POST", _BATCH_URL, content=content, headers=headers)
+        return await self.async_client.post(_BATCH_URL, content=content, headers=headers)
+
+    async def _asleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+    async def _arun_steps(self, steps: Iterator) -> Any:
+        """
+        Runs an _io_steps generator like _run_steps, awaiting the async counterpart of each call it yields.
+        """
+        result = error = None
+        while True:
+            try:
+                name, args, kwargs = steps.send(result) if error is None else steps.throw(error)
+            except StopIteration as done:
+                return done.value
+            result = error = None
+            try:
+                result = await getattr(self, _ASYNC_TRANSPORT.get(name, name))(*args, **kwargs)
+            except Exception as e:
+                error = e
+
+    async def get_messages_concurrent(self, message_ids: list[str]) -> list[dict[str, Any]]:
+        """
+        Retrieves several Gmail messages concurrently, issuing one get_message call per ID over the shared async connection pool.
+
+        Args:
+            message_ids: The unique identifiers of the Gmail messages to retrieve
+
+        Returns:
+            A list of dictionaries with the cleaned message details, in the same order as the requested IDs
+
+        Raises:
+            HTTPStatusError: When any of the Gmail API requests fails
+
+        Tags:
+            retrieve, email, messages, concurrent, gmail, api, readOnlyHint
+        """
+        return list(await asyncio.gather(*(self.get_message(i) for i in message_ids)))
+
+    @_async_variant(GoogleMailApp.get_messages_batch)
+    async def get_messages_batch(self, message_ids: list[str], format: str = "metadata", profile: str | None = None) -> list[dict[str, Any]]:
+        fields = self._profile_fields(profile)
+        chunks = [
+            message_ids[i : i + _BATCH_LIMIT]
+            for i in range(0, len(message_ids), _BATCH_LIMIT)
+        ]
+        semaphore = asyncio.Semaphore(_BATCH_CONCURRENCY)
+
+        async def fetch(chunk: list[str]) -> list[dict[str, Any]]:
+            async with semaphore:
+                return await self._batch_get_messages(chunk, format, fields)
+
+        results = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+        return [message for chunk in results for message in chunk]
+
+    @_async_variant(GoogleMailApp.list_all_messages)
+    async def list_all_messages(
+        self, q: str | None = None, total: int = 100, include_spam_trash: bool = False
+    ) -> dict[str, Any]:
+        if total < 1:
+            return {"messages": [], "next_page_token": None}
+        url = self._url_messages
+        base_params: dict[str, Any] = {}
+        if q:
+            base_params["q"] = q
+        if include_spam_trash:
+            base_params["includeSpamTrash"] = "true"
+
+        async def fetch_page(page_token: str | None, remaining: int) -> dict[str, Any]:
+            params = {**base_params, "maxResults": min(remaining, 500)}
+            if page_token:
+                params["pageToken"] = page_token
+            return await self._get_json(url, params)
+
+        messages = []
+        remaining = total
+        page = await fetch_page(None, remaining)
+        while True:
+            message_ids = [msg["id"] for msg in page.get("messages", []) if msg.get("id")]
+            remaining -= len(message_ids)
+            next_page_token = page.get("nextPageToken")
+            next_page = None
+            if next_page_token and remaining > 0:
+                next_page = asyncio.create_task(fetch_page(next_page_token, remaining))
+            messages.extend(
+                self._format_message(message)
+                for message in await self.get_messages_batch(message_ids, format="full", profile="formatted")
+            )
+            if next_page is None:
+                break
+            page = await next_page
+
+        return {"messages": messages, "next_page_token": next_page_token}
+
+    @_async_variant(GoogleMailApp.iter_history)
+    async def iter_history(self, userId: str = "me", **kwargs: Any) -> AsyncIterator[dict[str, Any]]:
+        page = await self.list_history(userId, **kwargs)
+        while True:
+            next_page_token = page.get("nextPageToken")
+            next_page = None
+            if next_page_token:
+                next_page = asyncio.create_task(
+                    self.list_history(userId, **{**kwargs, "pageToken": next_page_token})
+                )
+            for record in page.get("history", []):
+                yield record
+            if next_page is None:
+                return
+            page = await next_page
+
+    async def load_thread(self, thread_id: str) -> dict[str, Any]:
+        """
+        Retrieves a thread like get_thread, but coalesces the calls made within a few milliseconds
+        of each other into one Gmail batch request, and concurrent calls for the same thread into one lookup.
+
+        Args:
+            thread_id: The unique identifier of the Gmail thread to retrieve
+
+        Returns:
+            The thread resource, as returned by get_thread
+
+        Raises:
+            LookupError: When Gmail could not return the thread
+            HTTPStatusError: When the batch request itself is rejected by the Gmail API
+        """
+        cached = self._cached_read(_read_cache_key(self._url_threads + "/" + thread_id, None))
+        if cached is not None:
+            return cached
+        future = self._pending_threads.get(thread_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending_threads[thread_id] = future
+            if len(self._pending_threads) >= _BATCH_LIMIT:
+                # Keep a reference so the full batch is not garbage collected mid-flight
+                task = asyncio.create_task(self._load_threads(self._take_pending_threads()))
+                self._thread_loads.add(task)
+                task.add_done_callback(self._thread_loads.discard)
+            elif self._thread_flush is None:
+                self._thread_flush = asyncio.create_task(self._flush_threads_after_window())
+        # Shield the shared future so one cancelled caller does not cancel the others
+        return await asyncio.shield(future)
+
+    def _take_pending_threads(self) -> dict[str, asyncio.Future]:
+        pending, self._pending_threads = self._pending_threads, {}
+        return pending
+
+    async def _flush_threads_after_window(self) -> None:
+        await asyncio.sleep(_THREAD_LOAD_WINDOW)
+        self._thread_flush = None
+        await self._load_threads(self._take_pending_threads())
+
+    async def _load_threads(self, pending: dict[str, asyncio.Future]) -> None:
+        if not pending:
+            return
+        thread_ids = list(pending)
+        logger.info("Retrieving {} threads in one batch", len(thread_ids))
+        try:
+            results = await self._batch(
+                [{"path": "/gmail/v1/users/me/threads/" + _path_segment(thread_id)} for thread_id in thread_ids]
+            )
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for thread_id, result in zip(thread_ids, results):
+            future = pending[thread_id]
+            if future.done():
+                continue
+            if result["status"] == 200:
+                self._store_read(_read_cache_key(self._url_threads + "/" + thread_id, None), result["body"])
+                future.set_result(result["body"])
+            else:
+                future.set_exception(LookupError(f"Thread {thread_id} could not be retrieved (status {result['status']})"))
+
+    def list_tools(self):
+        return [*super().list_tools(), self.get_messages_concurrent]
@@ -1,11 +1,19 @@
+import asyncio
+import email
+import email.policy
+import inspect
+import json
+import re
 from unittest.mock import MagicMock
 
+import httpx
 import pytest
 from universal_mcp.utils.testing import (
     check_application_instance,
 )
 
-from universal_mcp_google_mail.app import GoogleMailApp
+from universal_mcp_google_mail import app as app_module
+from universal_mcp_google_mail.app import AsyncGoogleMailApp, GoogleMailApp, _message_path, _parse_batch_response
 
 @pytest.fixture
 def app_instance():
@@ -15,3 +23,310 @@ def app_instance():
 
 def test_application(app_instance):
     check_application_instance(app_instance, app_name="google-mail")
+
+def test_parse_batch_response():
+    content = (
+        b"--batch_abc\r\nContent-Type: application/http\r\nContent-ID: <response-item-0>\r\n\r\n"
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n{\"id\": \"m1\"}\r\n"
+        b"--batch_abc\r\nContent-Type: application/http\r\nContent-ID: <response-item-1>\r\n\r\n"
+        b"HTTP/1.1 404 Not Found\r\nContent-Type: application/json\r\n\r\n{\"error\": {\"code\": 404}}\r\n"
+        b"--batch_abc--\r\n"
+    )
+    responses = _parse_batch_response("multipart/mixed; boundary=batch_abc", content)
+    assert responses["item-0"] == (200, {"id": "m1"})
+    assert responses["item-1"][0] == 404
+
+def test_message_path_escapes_ids():
+    path = _message_path("m1 HTTP/1.1\r\nX-Injected: 1", "full")
+    assert path.startswith("/gmail/v1/users/me/messages/m1%20HTTP%2F1.1%0D%0AX-Injected%3A%201?")
+    assert " " not in path and "\r" not in path
+
+def test_create_mime_plain_text_round_trip(app_instance):
+    raw = bytes(app_instance._create_mime("a@example.com", "Héllo", "body ü"))
+    message = email.message_from_bytes(raw, policy=email.policy.default)
+    assert message["to"] == "a@example.com"
+    assert message["subject"] == "Héllo"
+    assert message.get_content() == "body ü"
+
+    raw = bytes(app_instance._create_mime("a@example.com", "Hi", "line one\nline two\r\nline three"))
+    assert b"Content-Transfer-Encoding: 7bit\r\n" in raw
+    assert raw.endswith(b"\r\n\r\nline one\r\nline two\r\nline three")
+    message = email.message_from_bytes(raw, policy=email.policy.default)
+    assert message.get_content().splitlines() == ["line one", "line two", "line three"]
+
+def test_cached_get_reuses_response_until_invalidated(app_instance):
+    app_instance._get = MagicMock(return_value=MagicMock(status_code=200, content=b'{"filter": []}'))
+    url = app_instance.base_url + "/gmail/v1/users/me/settings/filters"
+    assert app_instance.list_filters("me") == {"filter": []}
+    assert app_instance.list_filters("me") == {"filter": []}
+    assert app_instance._get.call_count == 1
+    app_instance.invalidate_user("me")
+    app_instance._cached_get(url, {})
+    assert app_instance._get.call_count == 2
+
+def test_read_cache_returns_copies_and_normalizes_user(app_instance):
+    app_instance._get = MagicMock(return_value=MagicMock(status_code=200, content=b'{"filter": []}'))
+    app_instance.list_filters("me")["filter"].append("mutated")
+    assert app_instance.list_filters("user@example.com") == {"filter": []}
+    assert app_instance._get.call_count == 1
+    app_instance.invalidate_user("user@example.com")
+    app_instance.list_filters("me")
+    assert app_instance._get.call_count == 2
+
+def test_async_app_tools_are_coroutines():
+    app = AsyncGoogleMailApp(integration=MagicMock())
+    blocking = [tool.__name__ for tool in app.list_tools() if not inspect.iscoroutinefunction(tool)]
+    assert blocking == []
+
+def test_message_cache_returns_copies_and_drops_trashed(app_instance):
+    app_instance._store_message("m1", {"id": "m1", "labels": ["INBOX"]})
+    app_instance._cached_message("m1")["labels"].append("mutated")
+    assert app_instance._cached_message("m1") == {"id": "m1", "labels": ["INBOX"]}
+    app_instance._post = MagicMock(return_value=MagicMock(status_code=200, content=b'{"id": "m1"}'))
+    app_instance.trash_messsages("me", "m1")
+    assert app_instance._cached_message("m1") is None
+
+def test_request_with_retry_honors_capped_retry_after(monkeypatch):
+    def handler(request):
+        handler.calls += 1
+        if handler.calls % 2:
+            return httpx.Response(429, headers={"Retry-After": "3600"})
+        return httpx.Response(200, json={"id": "m1"})
+
+    async def no_sleep(delay):
+        delays.append(delay)
+
+    handler.calls = 0
+    delays = []
+    monkeypatch.setattr(app_module.time, "sleep", delays.append)
+    monkeypatch.setattr(app_module.asyncio, "sleep", no_sleep)
+    app = GoogleMailApp(integration=MagicMock())
+    app._client = httpx.Client(transport=httpx.MockTransport(handler))
+    assert app._request_with_retry("GET", "https://gmail.googleapis.com/x").json() == {"id": "m1"}
+    async_app = AsyncGoogleMailApp(integration=MagicMock())
+    async_app._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    response = asyncio.run(async_app._arequest_with_retry("GET", "https://gmail.googleapis.com/x"))
+    assert response.json() == {"id": "m1"}
+    assert handler.calls == 4
+    assert delays == [app_module._RETRY_MAX_DELAY] * 2
+
+@pytest.mark.parametrize("request_", [
+    {"path": "/gmail/v1/users/me/messages/m1 HTTP/1.1\r\nX-Injected: 1"},
+    {"path": "/gmail/v1/users/me/messages/m1", "method": "CONNECT"},
+    {"path": "/oauth2/v1/userinfo"},
+])
+def test_batch_rejects_unsafe_sub_requests(app_instance, request_):
+    with pytest.raises(ValueError):
+        app_instance._batch([request_])
+
+def test_load_thread_coalesces_concurrent_calls_into_one_batch():
+    posts = []
+
+    def handler(request):
+        posts.append(request)
+        body = request.read()
+        parts = []
+        for item, thread_id in re.findall(rb"Content-ID: <item-(\d+)>\r\n\r\nGET /gmail/v1/users/me/threads/(\S+) HTTP", body):
+            status, payload = (404, b"{}") if thread_id == b"gone" else (200, b'{"id": "' + thread_id + b'"}')
+            parts.append(
+                b"--batch_x\r\nContent-Type: application/http\r\nContent-ID: <response-item-" + item + b">\r\n\r\n"
+                + b"HTTP/1.1 %d X\r\nContent-Type: application/json\r\n\r\n" % status + payload + b"\r\n"
+            )
+        content = b"".join(parts) + b"--batch_x--\r\n"
+        return httpx.Response(200, headers={"Content-Type": "multipart/mixed; boundary=batch_x"}, content=content)
+
+    async def load(app):
+        app._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return await asyncio.gather(
+            *(app.load_thread(thread_id) for thread_id in ("t1", "t2", "t1", "t3", "gone")),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(load(AsyncGoogleMailApp(integration=MagicMock())))
+    assert len(posts) == 1 and posts[0].method == "POST"
+    assert results[:4] == [{"id": "t1"}, {"id": "t2"}, {"id": "t1"}, {"id": "t3"}]
+    assert isinstance(results[4], LookupError)
+
+def test_get_all_settings_caches_only_complete_results(app_instance):
+    complete = [{"status": 200, "body": {}} for _ in range(5)]
+    app_instance._batch = MagicMock(return_value=complete[:4] + [{"status": 429, "body": None}])
+    assert len(app_instance.get_all_settings()) == 4
+    app_instance._batch.return_value = complete
+    assert len(app_instance.get_all_settings()) == 5
+    assert len(app_instance.get_all_settings()) == 5
+    assert app_instance._batch.call_count == 2
+
+def test_get_messages_batch_resends_rate_limited_lookups(monkeypatch):
+    def handler(request):
+        handler.posts += 1
+        parts = []
+        for item, message_id in re.findall(rb"Content-ID: <item-(\d+)>\r\n\r\nGET /gmail/v1/users/me/messages/(\w+)\?", request.read()):
+            limited = message_id == b"m2" and (handler.posts == 1 or handler.always_limited)
+            status, payload = (429, b"{}") if limited else (200, b'{"id": "' + message_id + b'"}')
+            parts.append(
+                b"--batch_x\r\nContent-Type: application/http\r\nContent-ID: <response-item-" + item + b">\r\n\r\n"
+                + b"HTTP/1.1 %d X\r\nContent-Type: application/json\r\n\r\n" % status + payload + b"\r\n"
+            )
+        content = b"".join(parts) + b"--batch_x--\r\n"
+        return httpx.Response(200, headers={"Content-Type": "multipart/mixed; boundary=batch_x"}, content=content)
+
+    handler.posts, handler.always_limited = 0, False
+    monkeypatch.setattr(app_module.time, "sleep", lambda delay: None)
+    app = GoogleMailApp(integration=MagicMock())
+    app._client = httpx.Client(transport=httpx.MockTransport(handler))
+    assert app.get_messages_batch(["m1", "m2", "m3"]) == [{"id": "m1"}, {"id": "m2"}, {"id": "m3"}]
+    assert handler.posts == 2
+    handler.always_limited = True
+    with pytest.raises(httpx.HTTPStatusError):
+        app.get_messages_batch(["m1", "m2"])
+
+
+def test_list_labels_returns_copies_of_the_cached_labels(app_instance):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"labels": [{"id": "INBOX", "name": "INBOX", "type": "system"}]})
+
+    app_instance._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    first = app_instance.list_labels()
+    first["labels"].clear()
+    second = app_instance.list_labels()
+
+    assert len(calls) == 1
+    assert second["labels"] == [{"id": "INBOX", "name": "INBOX", "type": "system"}]
+
+
+def test_get_profile_returns_copies_of_the_cached_profile(app_instance):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"emailAddress": "me@example.com", "historyId": "7"})
+
+    app_instance._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    app_instance.get_profile()["historyId"] = "changed"
+
+    assert app_instance.get_profile()["historyId"] == "7"
+    assert len(calls) == 1
+
+
+def _batch_message_response(request):
+    parts = [
+        b"--batch_x\r\nContent-Type: application/http\r\nContent-ID: <response-item-" + item + b">\r\n\r\n"
+        + b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n{"id": "' + message_id + b'"}\r\n'
+        for item, message_id in re.findall(rb"Content-ID: <item-(\d+)>\r\n\r\nGET /gmail/v1/users/me/messages/(\w+)\?", request.read())
+    ]
+    content = b"".join(parts) + b"--batch_x--\r\n"
+    return httpx.Response(200, headers={"Content-Type": "multipart/mixed; boundary=batch_x"}, content=content)
+
+
+def test_list_messages_since_falls_back_to_listing_when_history_is_gone(app_instance):
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        if request.url.path.endswith("/history"):
+            return httpx.Response(404, json={"error": {"code": 404}})
+        if request.url.path.endswith("/profile"):
+            return httpx.Response(200, json={"emailAddress": "me@example.com", "historyId": "200"})
+        return httpx.Response(200, json={"messages": []})
+
+    app_instance._client = httpx.Client(transport=httpx.MockTransport(handler))
+    app_instance._last_history_id = "100"
+
+    assert app_instance.list_messages_since() == {"messages": [], "history_id": "200"}
+    assert [path.rsplit("/", 1)[1] for path in paths] == ["history", "profile", "messages"]
+    assert app_instance._last_history_id == "200"
+
+
+def test_list_messages_since_returns_added_messages_and_records_history_id(app_instance):
+    start_ids = []
+
+    def handler(request):
+        if request.url.path.endswith("/history"):
+            start_ids.append(request.url.params["startHistoryId"])
+            if "pageToken" not in request.url.params:
+                records = [{"messagesAdded": [{"message": {"id": "m1"}}, {"message": {"id": "m2"}}]}]
+                return httpx.Response(200, json={"history": records, "nextPageToken": "p2", "historyId": "150"})
+            records = [{"messagesAdded": [{"message": {"id": "m2"}}, {"message": {"id": "m3"}}]}]
+            return httpx.Response(200, json={"history": records, "historyId": "150"})
+        return _batch_message_response(request)
+
+    app_instance._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    result = app_instance.list_messages_since("100")
+    assert [message["message_id"] for message in result["messages"]] == ["m1", "m2", "m3"]
+    assert result["history_id"] == "150"
+    assert app_instance._last_history_id == "150"
+    assert start_ids == ["100", "100"]
+
+    app_instance.list_messages_since()
+    assert start_ids[-1] == "150"
+
+
+def test_list_all_messages_pages_in_order_up_to_total(app_instance):
+    pages = {None: ["m1", "m2", "m3"], "p2": ["m4", "m5", "m6"], "p3": ["m7", "m8", "m9"]}
+    next_tokens = {None: "p2", "p2": "p3", "p3": "p4"}
+    max_results = []
+
+    def handler(request):
+        if request.url.path.endswith("/messages"):
+            token = request.url.params.get("pageToken")
+            limit = int(request.url.params["maxResults"])
+            max_results.append(limit)
+            ids = pages[token][:limit]
+            return httpx.Response(200, json={"messages": [{"id": i} for i in ids], "nextPageToken": next_tokens[token]})
+        return _batch_message_response(request)
+
+    app_instance._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    result = app_instance.list_all_messages(total=7)
+    assert [message["message_id"] for message in result["messages"]] == ["m1", "m2", "m3", "m4", "m5", "m6", "m7"]
+    assert max_results == [7, 4, 1]
+    assert result["next_page_token"] == "p4"
+
+
+def test_send_email_uploads_large_messages_as_multipart_related(app_instance):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"id": "sent", "threadId": "t1"})
+
+    app_instance._client = httpx.Client(transport=httpx.MockTransport(handler))
+    body = ("x" * 99 + "\n") * (6 * 1024 * 1024 // 100)
+
+    assert app_instance.send_email("a@example.com", "Big", body, thread_id="t1") == {"id": "sent", "threadId": "t1"}
+    (request,) = requests
+    assert request.url.path == "/upload/gmail/v1/users/me/messages/send"
+    assert request.url.params["uploadType"] == "multipart"
+    content_type, boundary = request.headers["Content-Type"].split("; boundary=")
+    assert content_type == "multipart/related"
+    parts = request.read().split(b"--" + boundary.encode())
+    assert parts[0] == b"" and parts[-1] == b"--\r\n"
+    metadata, message = parts[1:-1]
+    assert metadata.startswith(b"\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n")
+    assert metadata.rstrip(b"\r\n").endswith(b'{"threadId":"t1"}')
+    assert message.startswith(b"\r\nContent-Type: message/rfc822\r\n\r\nTo: a@example.com\r\n")
+    parsed = email.message_from_bytes(message.split(b"\r\n\r\n", 1)[1][:-2], policy=email.policy.default)
+    assert parsed["subject"] == "Big"
+    assert parsed.get_content().replace("\r\n", "\n") == body
+
+
+def test_batch_modify_messages_sends_at_most_1000_ids_per_request(app_instance):
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.read()))
+        return httpx.Response(204)
+
+    app_instance._client = httpx.Client(transport=httpx.MockTransport(handler))
+    ids = [f"m{i}" for i in range(2500)]
+
+    assert app_instance.batch_modify_messages("me", ids, removeLabelIds=["UNREAD"]) is None
+    assert [len(body["ids"]) for body in bodies] == [1000, 1000, 500]
+    assert [message_id for body in bodies for message_id in body["ids"]] == ids
+    assert all(body["removeLabelIds"] == ["UNREAD"] for body in bodies)